@@ -31,5 +31,13 @@ sed -i -r -f ${settings_sed_script} settings.yml
 # Run
 #
 
+# Create the tables once here instead of in each of the workers
+if [[ "${OMPID_CREATE_TABLES:-0}" == "1" ]]; then
+    python3 -c 'import asyncio, ompid; asyncio.run(ompid.init_tables())'
+    export OMPID_CREATE_TABLES=0
+fi
+
 app="ompid:app"
-exec uvicorn --host "0.0.0.0" --no-use-colors --access-log ${app}
+exec uvicorn --host "0.0.0.0" --no-use-colors --access-log \
+    --workers "${UVICORN_WORKERS:-4}" --loop uvloop --http httptools \
+    ${app}
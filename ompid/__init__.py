@@ -1,60 +1,151 @@
 import os
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
 import logging
 import logging.config
 
 import yaml
-from fastapi import FastAPI, HTTPException
-from fastapi.encoders import jsonable_encoder
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.params import Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy import and_
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
+from sqlalchemy import and_, select, text, tuple_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import configure_mappers
 from starlette import status
 
+try:
+    # libyaml based parser
+    from yaml import CSafeLoader as SettingsLoader
+except ImportError:
+    from yaml import SafeLoader as SettingsLoader
+
 from ompid.models import Base, TopioUser, TopioUserCreate, TopioUserORM, \
     TopioAssetType, TopioAssetTypeORM, TopioAsset, TopioAssetORM, \
-    TopioAssetCreate, TopioUserQuery
+    TopioAssetCreate, TopioUserQuery, BatchTopioIdQuery
 
-logging.config.fileConfig(os.getenv('LOGGING_FILE_CONFIG', './logging.conf'))
 logger = logging.getLogger(__name__)
+_logging_configured = False
+
+CACHE_PREFIX = 'ompid'
+DEFAULT_CACHE_EXPIRE = 3600
 
 
+@lru_cache(maxsize=1)
 def load_default_configuration():
-    with open(os.path.join(os.getcwd(), 'settings.yml')) as yaml_file:
-        cfg = yaml.safe_load(yaml_file)
+    if SettingsLoader is yaml.SafeLoader:
+        logger.warning(
+            'PyYAML was built without libyaml; falling back to the pure '
+            'Python YAML parser')
+
+    yaml_content = (Path(os.getcwd()) / 'settings.yml').read_bytes()
+    cfg = yaml.load(yaml_content, Loader=SettingsLoader)
 
     return cfg
 
 
 async def get_db():
-    from ompid.db import SessionLocal
-    db = SessionLocal()
+    from ompid.db import Session
 
     try:
-        yield db
+        yield Session()
     finally:
-        db.close()
+        await Session.remove()
+
+
+def build_cache_key(
+        func, namespace='', request=None, response=None, args=None, kwargs=None):
+    # the database session differs for each request and must not be part of
+    # the cache key
+    params = sorted(
+        (name, value) for name, value in (kwargs or {}).items() if name != 'db')
+
+    return f'{FastAPICache.get_prefix()}:{namespace}:{func.__name__}:{params}'
+
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
-app = FastAPI()
+
+@app.on_event('startup')
+def init_logging():
+    global _logging_configured
+
+    if not _logging_configured:
+        logging.config.fileConfig(
+            os.getenv('LOGGING_FILE_CONFIG', './logging.conf'))
+        _logging_configured = True
+
+
+@app.on_event('startup')
+def init_cache():
+    redis_settings = load_default_configuration().get('redis')
+
+    if redis_settings is None:
+        # caching is disabled; a backend is still needed for cache
+        # invalidation calls
+        FastAPICache.init(
+            InMemoryBackend(), prefix=CACHE_PREFIX, enable=False)
+    else:
+        FastAPICache.init(
+            RedisBackend(aioredis.from_url(redis_settings['url'])),
+            prefix=CACHE_PREFIX,
+            expire=redis_settings.get('expire', DEFAULT_CACHE_EXPIRE),
+            key_builder=build_cache_key)
 
 
 @app.on_event('startup')
-def init_tables():
+async def init_tables():
+    # Only enabled on request as otherwise each worker would run the schema
+    # introspection queries on boot
+    if os.getenv('OMPID_CREATE_TABLES') != '1':
+        return
+
     import ompid.db
-    Base.metadata.create_all(ompid.db.engine)
+
+    try:
+        async with ompid.db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    finally:
+        # Otherwise the pooled connection would outlive the event loop when run
+        # on its own (see docker-command.sh)
+        await ompid.db.engine.dispose()
+
+
+@app.on_event('startup')
+async def warm_up():
+    """
+    Does the work otherwise done lazily when serving the first requests, i.e.
+    setting up the ORM mappers, building the pydantic validators and opening a
+    first database connection.
+    """
+    import ompid.db
+
+    configure_mappers()
+
+    TopioUserCreate(name='warm-up', user_namespace='warm-up')
+    TopioAssetType(id='warm-up')
+    TopioAssetCreate(owner_id=0, asset_type='warm-up')
+
+    async with ompid.db.engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
 
 
 @app.post('/users/register', response_model=TopioUser, responses={201: {"model": TopioUser}})
-async def register_user(topio_user: TopioUserCreate, db: Session = Depends(get_db)):
+async def register_user(
+        topio_user: TopioUserCreate,
+        response: Response,
+        db: AsyncSession = Depends(get_db)):
 
-    topio_user_orm = (
-        db
-        .query(TopioUserORM)
-        .filter(and_(TopioUserORM.name == topio_user.name, TopioUserORM.user_namespace == topio_user.user_namespace))
-        .first()
-    )
+    topio_user_orm = (await db.execute(
+        select(TopioUserORM)
+        .where(and_(TopioUserORM.name == topio_user.name, TopioUserORM.user_namespace == topio_user.user_namespace))
+    )).scalars().first()
 
     if topio_user_orm is not None:
         return topio_user_orm
@@ -64,8 +155,7 @@ async def register_user(topio_user: TopioUserCreate, db: Session = Depends(get_d
 
     try:
         db.add(topio_user_orm)
-        db.commit()
-        db.refresh(topio_user_orm)
+        await db.commit()
     except Exception as e:
         # interfering here to really log errors which are otherwise not reported
         # by FastAPI
@@ -73,16 +163,16 @@ async def register_user(topio_user: TopioUserCreate, db: Session = Depends(get_d
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-    topio_user_json = jsonable_encoder(topio_user_orm)
-    return JSONResponse(
-        status_code=status.HTTP_201_CREATED, content=topio_user_json)
+    response.status_code = status.HTTP_201_CREATED
+    return topio_user_orm
 
 
 @app.get('/users/{topio_user_id}', response_model=TopioUser)
-async def get_user_info(topio_user_id: int, db: Session = Depends(get_db)):
+async def get_user_info(topio_user_id: int, db: AsyncSession = Depends(get_db)):
     try:
-        topio_user_orm = \
-            db.query(TopioUserORM).filter(TopioUserORM.id == topio_user_id).first()
+        topio_user_orm = (await db.execute(
+            select(TopioUserORM).where(TopioUserORM.id == topio_user_id)
+        )).scalar_one_or_none()
     except Exception as e:
         # interfering here to really log errors which are otherwise not reported
         # by FastAPI
@@ -103,15 +193,15 @@ async def get_user_info(topio_user_id: int, db: Session = Depends(get_db)):
 
 @app.post('/asset_types/register', response_model=TopioAssetType, responses={201: {"model": TopioAssetType}})
 async def register_asset_type(
-        topio_asset_type: TopioAssetType, db: Session = Depends(get_db)):
+        topio_asset_type: TopioAssetType,
+        response: Response,
+        db: AsyncSession = Depends(get_db)):
 
     try:
-        topio_asset_type_orm = (
-            db
-            .query(TopioAssetTypeORM)
-            .filter(and_(TopioAssetTypeORM.id == topio_asset_type.id, TopioAssetTypeORM.description == topio_asset_type.description))
-            .first()
-        )
+        topio_asset_type_orm = (await db.execute(
+            select(TopioAssetTypeORM)
+            .where(and_(TopioAssetTypeORM.id == topio_asset_type.id, TopioAssetTypeORM.description == topio_asset_type.description))
+        )).scalar_one_or_none()
     except Exception as e:
         logger.error(e)
         raise HTTPException(
@@ -126,27 +216,29 @@ async def register_asset_type(
 
     try:
         db.add(topio_asset_type_orm)
-        db.commit()
-        db.refresh(topio_asset_type_orm)
+        await db.commit()
     except Exception as e:
         logger.error(e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e))
 
-    topio_asset_type_json = jsonable_encoder(topio_asset_type_orm)
-    return JSONResponse(status_code=201, content=topio_asset_type_json)
+    await FastAPICache.clear(namespace='asset_types')
+
+    response.status_code = status.HTTP_201_CREATED
+    return topio_asset_type_orm
 
 
 @app.get('/asset_types/{topio_asset_type_id}', response_model=TopioAssetType)
+@cache(namespace='asset_types')
 async def get_asset_namespace_info(
-        topio_asset_type_id: str, db: Session = Depends(get_db)):
+        topio_asset_type_id: str, db: AsyncSession = Depends(get_db)):
 
     try:
-        topio_asset_type_orm = db\
-            .query(TopioAssetTypeORM)\
-            .filter(TopioAssetTypeORM.id == topio_asset_type_id)\
-            .first()
+        topio_asset_type_orm = (await db.execute(
+            select(TopioAssetTypeORM)
+            .where(TopioAssetTypeORM.id == topio_asset_type_id)
+        )).scalar_one_or_none()
     except Exception as e:
         logger.error(e)
         raise HTTPException(
@@ -154,7 +246,7 @@ async def get_asset_namespace_info(
             detail=str(e))
 
     if topio_asset_type_orm is not None:
-        return topio_asset_type_orm
+        return TopioAssetType.model_validate(topio_asset_type_orm)
 
     else:
         err_msg = f'Asset type with ID {topio_asset_type_id} not found'
@@ -165,9 +257,10 @@ async def get_asset_namespace_info(
 
 
 @app.get('/asset_types/', response_model=List[TopioAssetType])
-async def get_asset_types(db: Session = Depends(get_db)):
+@cache(namespace='asset_types')
+async def get_asset_types(db: AsyncSession = Depends(get_db)):
     try:
-        res = db.query(TopioAssetTypeORM).all()
+        res = (await db.execute(select(TopioAssetTypeORM))).scalars().all()
     except Exception as e:
         logger.error(e)
 
@@ -175,21 +268,25 @@ async def get_asset_types(db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e))
 
-    return res
+    return [TopioAssetType.model_validate(asset_type) for asset_type in res]
 
 
 @app.post('/assets/register', response_model=TopioAsset)
-async def register_asset(topio_asset: TopioAssetCreate, db: Session = Depends(get_db)):
-    topio_asset_orm = TopioAssetORM(
-        local_id=topio_asset.local_id,
-        owner_id=topio_asset.owner_id,
-        asset_type=topio_asset.asset_type,
-        description=topio_asset.description)
-
+async def register_asset(topio_asset: TopioAssetCreate, db: AsyncSession = Depends(get_db)):
     try:
+        owner = await db.get(TopioUserORM, topio_asset.owner_id)
+
+        # a non-existing owner is reported via the violated foreign key
+        # constraint when inserting the asset
+        topio_asset_orm = TopioAssetORM(
+            local_id=topio_asset.local_id,
+            owner_id=topio_asset.owner_id,
+            owner_namespace=owner.user_namespace if owner else None,
+            asset_type=topio_asset.asset_type,
+            description=topio_asset.description)
+
         db.add(topio_asset_orm)
-        db.commit()
-        db.refresh(topio_asset_orm)
+        await db.commit()
     except IntegrityError as e:
         logger.error(e)
         raise HTTPException(
@@ -205,11 +302,12 @@ async def register_asset(topio_asset: TopioAssetCreate, db: Session = Depends(ge
 
 
 @app.get('/assets/topio_id', response_model=str, responses={404: {"model": str}})
+@cache(namespace='assets')
 async def get_topio_id(
         owner_id: int,
         asset_type: str, 
         local_id: str,
-        db: Session = Depends(get_db)):
+        db: AsyncSession = Depends(get_db)):
     """
     Returns the topio ID for a given asset identified by
     - the asset owner ID
@@ -219,71 +317,127 @@ async def get_topio_id(
     :param owner_id: the asset owner ID
     :param asset_type: the asset type
     :param local_id: the asset's local ID
-    :param db: database session (will be provided by FastAPI's dependency
+    :param db: async database session (will be provided by FastAPI's dependency
         injection mechanism.
     :return: A string containing the topio ID of the respective asset
     """
 
     try:
-        asset = db\
-            .query(TopioAssetORM)\
-            .filter(TopioAssetORM.owner_id == owner_id,
-                    TopioAssetORM.asset_type == asset_type,
-                    TopioAssetORM.local_id == local_id)\
-            .first()
+        topio_id = (await db.execute(
+            select(TopioAssetORM.topio_id)
+            .where(TopioAssetORM.owner_id == owner_id,
+                   TopioAssetORM.asset_type == asset_type,
+                   TopioAssetORM.local_id == local_id)
+            # in case a local ID was registered more than once, the asset with
+            # the lowest ID wins (as in get_topio_ids)
+            .order_by(TopioAssetORM.id)
+        )).scalars().first()
     except Exception as e:
         logger.error(e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e))
 
-    if asset is None:
+    if topio_id is None:
         err_msg = 'No topio ID found for the given parameters'
         logger.warning(err_msg)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=err_msg)
 
-    return asset.topio_id
+    return topio_id
+
+
+@app.post('/assets/topio_ids/batch', response_model=List[Optional[str]])
+async def get_topio_ids(
+        query: BatchTopioIdQuery, db: AsyncSession = Depends(get_db)):
+    """
+    Batch version of get_topio_id. Returns the topio IDs for a list of assets,
+    each identified by
+    - the asset owner ID
+    - the asset type
+    - the asset's local ID
+
+    :param query: the list of assets to look up
+    :param db: async database session (will be provided by FastAPI's
+        dependency injection mechanism.
+    :return: A list containing the topio ID of each of the requested assets,
+        in the order of the request, or None if there is no topio ID for an
+        asset
+    """
+    keys = [
+        (item.owner_id, item.asset_type, item.local_id)
+        for item in query.items]
+
+    try:
+        rows = (await db.execute(
+            select(
+                TopioAssetORM.owner_id,
+                TopioAssetORM.asset_type,
+                TopioAssetORM.local_id,
+                TopioAssetORM.topio_id)
+            .where(tuple_(
+                TopioAssetORM.owner_id,
+                TopioAssetORM.asset_type,
+                TopioAssetORM.local_id).in_(keys))
+            .order_by(TopioAssetORM.id)
+        )).all()
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e))
+
+    topio_ids = {}
+    for owner_id, asset_type, local_id, topio_id in rows:
+        # in case a local ID was registered more than once, the asset with the
+        # lowest ID wins
+        topio_ids.setdefault((owner_id, asset_type, local_id), topio_id)
+
+    return [topio_ids.get(key) for key in keys]
 
 
 @app.get('/assets/custom_id', response_model=str)
-async def get_custom_id(query: dict, db: Session = Depends(get_db)):
-    topio_id: str = query.get('topio_id')
+@cache(namespace='assets')
+async def get_custom_id(topio_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Returns the local ID of the asset with the given topio ID.
 
-    if topio_id is None:
-        asset = None
-    else:
-        try:
-            asset = db\
-                .query(TopioAssetORM)\
-                .filter(
-                    TopioAssetORM.topio_id == topio_id,
-                    TopioAssetORM.local_id != None)\
-                .first()
-        except Exception as e:
-            logger.error(e)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=str(e))
-
-    if asset is None:
+    :param topio_id: the topio ID of the asset
+    :param db: async database session (will be provided by FastAPI's
+        dependency injection mechanism.
+    :return: A string containing the local ID of the respective asset
+    """
+    try:
+        local_id = (await db.execute(
+            select(TopioAssetORM.local_id)
+            .where(
+                TopioAssetORM.topio_id == topio_id,
+                TopioAssetORM.local_id.isnot(None))
+        )).scalar_one_or_none()
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e))
+
+    if local_id is None:
         err_msg = f'No custom ID found for topio ID {topio_id}'
         logger.warning(err_msg)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=err_msg)
 
-    return asset.local_id
+    return local_id
 
 
 @app.get('/assets/', response_model=List[TopioAsset])
-async def get_users_assets(user: TopioUserQuery, db: Session = Depends(get_db)):
+async def get_users_assets(user: TopioUserQuery, db: AsyncSession = Depends(get_db)):
     try:
-        assets = db\
-            .query(TopioAssetORM)\
-            .filter(TopioAssetORM.owner_id == user.user_id)\
-            .all()
+        assets = (await db.execute(
+            select(TopioAssetORM)
+            .where(TopioAssetORM.owner_id == user.user_id)
+        )).scalars().all()
     except Exception as e:
         logger.error(e)
         raise HTTPException(
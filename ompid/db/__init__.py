@@ -1,22 +1,42 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+from asyncio import current_task
+
+from sqlalchemy.ext.asyncio import async_scoped_session, async_sessionmaker, \
+    create_async_engine
 
 import ompid
 
+# SQL statements are only logged if explicitly asked for via the `echo` setting
+logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+
 
 def build_postgresql_url(settings):
     pg_settings = settings['postgresql']
-    return f'postgresql://' \
+    return f'postgresql+asyncpg://' \
         f'{pg_settings["user"]}:{pg_settings["password"]}' \
         f'@{pg_settings["host"]}:{pg_settings["port"]}' \
         f'/{pg_settings["db"]}'
 
 
-engine = create_engine(
-    build_postgresql_url(ompid.load_default_configuration()),
-    echo=True,
-    pool_pre_ping=True)
+def create_engine_from_settings(settings):
+    pg_settings = settings['postgresql']
+
+    return create_async_engine(
+        build_postgresql_url(settings),
+        echo=pg_settings.get('echo', False),
+        pool_size=pg_settings.get('pool_size', 5),
+        max_overflow=pg_settings.get('max_overflow', 5),
+        # rather than pinging the server on every checkout, connections are
+        # replaced periodically and kept alive via TCP keepalives
+        pool_recycle=pg_settings.get('pool_recycle', 1800),
+        connect_args={'server_settings': {'tcp_keepalives_idle': '60'}})
+
+
+engine = create_engine_from_settings(ompid.load_default_configuration())
 
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    engine, autoflush=False, expire_on_commit=False)
 
+# one session per asyncio task, i.e. per request
+Session = async_scoped_session(SessionLocal, scopefunc=current_task)
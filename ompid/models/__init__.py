@@ -1,16 +1,16 @@
 import re
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import pydantic
-from pydantic import validator
-from sqlalchemy import Column, ForeignKey, func
-from sqlalchemy import select
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import column_property, ColumnProperty
+from pydantic import ConfigDict, Field, field_validator
+from sqlalchemy import Column, Computed, ForeignKey, Index
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql.sqltypes import Integer, String
 
 Base = declarative_base()
 
+_contains_whitespace = re.compile(r'\s').search
+
 # ------------ topio ID pattern related constants and methods -----------------
 TOPIO_ID_SCHEMA = 'topio.{owner_namespace}.{asset_id}.{asset_type}'
 
@@ -21,13 +21,9 @@ def topio_id_to_parts(topio_id: str) -> Tuple[int, str, str]:
     return asset_id, asset_type, owner_ns
 
 
-def build_topio_id_column_property(
-        owner_namespace: ColumnProperty,
-        asset_id: int,
-        asset_type: str):
-
-    return 'topio.' + owner_namespace.expression + '.' + \
-        func.cast(asset_id, String) + '.' + asset_type
+# SQL counterpart of TOPIO_ID_SCHEMA used for the generated topio_id column
+TOPIO_ID_SQL_EXPRESSION = \
+    "'topio.' || owner_namespace || '.' || CAST(id AS TEXT) || '.' || asset_type"
 # -----------------------------------------------------------------------------
 
 
@@ -53,9 +49,14 @@ class TopioUserCreate(pydantic.BaseModel):
     name: str
     user_namespace: str
 
-    @validator('user_namespace')
+    # numeric names and namespaces are accepted as strings (pydantic v1
+    # behaviour)
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    @field_validator('user_namespace')
+    @classmethod
     def _validate_user_namespace(cls, ns):
-        if re.search(r'\s', ns):
+        if _contains_whitespace(ns):
             raise ValueError('user namespace must not contain whitespace')
         return ns
 
@@ -63,8 +64,7 @@ class TopioUserCreate(pydantic.BaseModel):
 class TopioUser(TopioUserCreate):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TopioAssetTypeORM(Base):
@@ -92,16 +92,17 @@ class TopioAssetType(pydantic.BaseModel):
     id: str
     description: Optional[str] = None
 
-    @validator('id')
+    @field_validator('id')
+    @classmethod
     def _validate_asset_type_id(cls, asset_type_id):
-        if re.search(r'\s', asset_type_id):
+        if _contains_whitespace(asset_type_id):
             raise ValueError(
                 'Asset type identifier must not contain whitespace')
 
         return asset_type_id
 
-    class Config:
-        orm_mode = True
+    # numeric asset type IDs are accepted as strings (pydantic v1 behaviour)
+    model_config = ConfigDict(from_attributes=True, coerce_numbers_to_str=True)
 
 
 class TopioAssetORM(Base):
@@ -117,6 +118,12 @@ class TopioAssetORM(Base):
     identifiers.
     """
     __tablename__ = 'topio_asset'
+    __table_args__ = (
+        # local-ID-to-topio-ID lookups (see ompid.get_topio_id)
+        Index('ix_asset_owner_type_local', 'owner_id', 'asset_type', 'local_id'),
+    )
+    # fetch the generated topio ID via INSERT ... RETURNING
+    __mapper_args__ = {'eager_defaults': True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     local_id = Column(String)
@@ -124,12 +131,14 @@ class TopioAssetORM(Base):
     asset_type = Column(String, ForeignKey('topio_asset_type.id'))
     description = Column(String)
 
-    owner_namespace = column_property(
-        select([TopioUserORM.user_namespace])
-        .where(TopioUserORM.id == owner_id).as_scalar())
-
-    topio_id = column_property(
-        build_topio_id_column_property(owner_namespace, id, asset_type))
+    # copy of the owner's user namespace (which never changes after user
+    # registration) s.t. the topio ID can be stored as generated column
+    owner_namespace = Column(String)
+    topio_id = Column(
+        String,
+        Computed(TOPIO_ID_SQL_EXPRESSION, persisted=True),
+        index=True,
+        unique=True)
 
 
 class TopioAssetCreate(pydantic.BaseModel):
@@ -138,10 +147,34 @@ class TopioAssetCreate(pydantic.BaseModel):
     asset_type: str
     description: Optional[str] = None
 
+    # numeric asset type IDs are accepted as strings (pydantic v1 behaviour)
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
 
 class TopioAsset(TopioAssetCreate):
     id: int
     topio_id: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TopioAssetQuery(pydantic.BaseModel):
+    """
+    An asset looked up by its local ID, with the same parameters as a single
+    topio ID lookup
+    """
+    owner_id: int
+    asset_type: str
+    local_id: str
+
+    # query parameters of a single lookup are strings as well
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
+# Each item is looked up with three bound parameters and PostgreSQL accepts at
+# most 32767 parameters per statement
+MAX_BATCH_SIZE = 10000
+
+
+class BatchTopioIdQuery(pydantic.BaseModel):
+    items: List[TopioAssetQuery] = Field(max_length=MAX_BATCH_SIZE)
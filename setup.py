@@ -1,4 +1,4 @@
-from distutils.core import setup
+from setuptools import setup
 
 setup(
     name='persistent-identifier-service',
@@ -11,15 +11,21 @@ setup(
     author='Patrick Westphal',
     author_email='',
     description='',
+    python_requires='>=3.8',
     install_requires=[
-        'fastapi==0.65.2',
-        'uvicorn==0.12.3',
-        'SQLAlchemy==1.3.17',
-        'PyYAML==5.4',
-        'pydantic==1.6.2',
-        'psycopg2==2.8.5',
-        'pytest-postgresql==2.5.3',
-        'pytest==6.2.2',
-        'requests==2.25.1',
+        'fastapi==0.110.0',
+        'uvicorn[standard]==0.27.1',
+        'SQLAlchemy[asyncio]==2.0.23',
+        'asyncpg==0.29.0',
+        'PyYAML==6.0.1',
+        'pydantic==2.5.3',
+        'fastapi-cache2[redis]==0.2.1',
+        'orjson==3.9.10',
+        'psycopg[binary]==3.1.18',
+        'pytest-postgresql==5.0.0',
+        'pytest==7.4.4',
+        'pytest-asyncio==0.23.5',
+        'pytest-xdist==3.5.0',
+        'httpx==0.26.0',
     ]
 )
@@ -1,79 +1,158 @@
-import json
-
-from pytest_postgresql.compat import connection, cursor
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from starlette import status
-from starlette.testclient import TestClient
+from asyncio import current_task
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession, async_scoped_session, async_sessionmaker)
+from starlette.status import (
+    HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND,
+    HTTP_500_INTERNAL_SERVER_ERROR)
 
 import ompid
 import ompid.db
-from ompid import app, Base
-from ompid.models import TOPIO_ID_SCHEMA
+from ompid import app
+from ompid.models import (
+    MAX_BATCH_SIZE, TOPIO_ID_SCHEMA, TopioAssetORM, TopioAssetTypeORM,
+    TopioUserORM)
 
 
-def _init_test_client(postgresql: connection) -> TestClient:
-    mock_engine = create_engine(
-        name_or_url='postgresql://',
-        connect_args=postgresql.get_dsn_parameters())
+pytestmark = pytest.mark.asyncio
 
-    async def get_mock_db():
-        MockSessionLocal = \
-            sessionmaker(autocommit=False, autoflush=False, bind=mock_engine)
-        db = MockSessionLocal()
+OWNER_NAMESPACE = 'abc'
 
-        try:
-            yield db
-        finally:
-            db.close()
+# request bodies shared by several tests
+FILE_ASSET_TYPE = {
+    'id': 'file',
+    'description': 'Data assets provided as downloadable file'}
+API_ASSET_TYPE = {
+    'id': 'api',
+    'description':
+        'Data that is provided via a well defined application programming '
+        'interface'}
 
-    app.dependency_overrides[ompid.get_db] = get_mock_db
-    Base.metadata.create_all(mock_engine)
 
-    return TestClient(app)
+# The owner and asset types the asset tests depend on are written directly
+# to the database; their registration is covered by the users and asset types
+# tests
+
+@pytest_asyncio.fixture
+async def owner_id(db_session: AsyncSession) -> int:
+    owner = TopioUserORM(name='User ABC', user_namespace=OWNER_NAMESPACE)
+    db_session.add(owner)
+    await db_session.commit()
+
+    return owner.id
+
+
+@pytest_asyncio.fixture
+async def file_asset_type(db_session: AsyncSession) -> str:
+    db_session.add(TopioAssetTypeORM(**FILE_ASSET_TYPE))
+    await db_session.commit()
+
+    return FILE_ASSET_TYPE['id']
+
 
+@pytest_asyncio.fixture
+async def api_asset_type(db_session: AsyncSession) -> str:
+    db_session.add(TopioAssetTypeORM(**API_ASSET_TYPE))
+    await db_session.commit()
 
-def _init_broken_test_client(postgresql: connection) -> TestClient:
+    return API_ASSET_TYPE['id']
+
+
+def _use_broken_db():
     async def get_mock_db():
         #                   will be broken due to missing engine -v
-        MockSessionLocal = \
-            sessionmaker(autocommit=False, autoflush=False, bind=None)
+        MockSessionLocal = async_sessionmaker(bind=None)
         db = MockSessionLocal()
-        db.close()
+        await db.close()
 
         yield db
 
     app.dependency_overrides[ompid.get_db] = get_mock_db
 
-    return TestClient(app)
 
+async def _fetchall(
+        db_session: AsyncSession, statement: str, **params) -> list:
+    result = await db_session.execute(text(statement), params)
+
+    return result.fetchall()
+
+
+async def _seed_assets(
+        db_session: AsyncSession,
+        owner_namespace: str,
+        assets: list) -> list:
+    """
+    Writes the given assets (dicts of TopioAssetORM column values) in one go
+    without going through /assets/register and returns their IDs
+    """
+    asset_orms = [
+        TopioAssetORM(owner_namespace=owner_namespace, **asset)
+        for asset in assets]
+    db_session.add_all(asset_orms)
+    await db_session.commit()
+
+    return [asset_orm.id for asset_orm in asset_orms]
 
-def test_users_register(postgresql: connection):
-    client = _init_test_client(postgresql)
 
+@pytest_asyncio.fixture
+async def assets(
+        db_session: AsyncSession,
+        owner_id: int,
+        file_asset_type: str,
+        api_asset_type: str) -> list:
+    """
+    Three assets of the owner in the form they are returned by the API: One
+    without local ID and description and two with local IDs and different
+    asset types
+    """
+    assets = [
+        {
+            'local_id': None,
+            'owner_id': owner_id,
+            'asset_type': file_asset_type,
+            'description': None},
+        {
+            'local_id': 'hdfs://foo.bar.ttl',
+            'owner_id': owner_id,
+            'asset_type': file_asset_type,
+            'description': 'A Turtle HDFS file'},
+        {
+            'local_id': 'http://topio.market:7777/api',
+            'owner_id': owner_id,
+            'asset_type': api_asset_type,
+            'description': None}]
+
+    asset_ids = await _seed_assets(db_session, OWNER_NAMESPACE, assets)
+
+    for asset, asset_id in zip(assets, asset_ids):
+        asset['id'] = asset_id
+        asset['topio_id'] = TOPIO_ID_SCHEMA.format(**{
+            'owner_namespace': OWNER_NAMESPACE,
+            'asset_id': asset_id,
+            'asset_type': asset['asset_type']})
+
+    return assets
+
+
+async def test_users_register(client: AsyncClient, db_session: AsyncSession):
     # normal user -----------------------------------------
     user_name = 'User ABC'
     user_namespace = 'abc'
-    response = client.post(
+    response = await client.post(
         '/users/register',
         json={'name': user_name, 'user_namespace': user_namespace})
 
     # no errors were raised
     assert response.status_code == 201
 
-    # user data can be found in the database
-    user_id: int = json.loads(response.content)['id']
-    cur: cursor = postgresql.cursor()
-    cur.execute(
-        f'SELECT * FROM topio_user '
-        f'WHERE id=%s AND name=%s AND user_namespace=%s;',
-        (user_id, user_name, user_namespace))
-    results = cur.fetchall()
-    cur.close()
-    assert len(results) == 1
+    user_id: int = response.json()['id']
 
     # existing user ---------------------------------------
-    response = client.post(
+    response = await client.post(
         '/users/register',
         json={'name': user_name, 'user_namespace': user_namespace})
 
@@ -83,7 +162,7 @@ def test_users_register(postgresql: connection):
     # user with broken namespace (contains whitespace) ----
     user_name = 'User DEF'
     user_namespace = 'this is broken'
-    response = client.post(
+    response = await client.post(
         '/users/register',
         json={'name': user_name, 'user_namespace': user_namespace})
 
@@ -91,123 +170,133 @@ def test_users_register(postgresql: connection):
     assert response.status_code == 422
 
     # ...and it should be a value error
-    error_type = json.loads(response.content)['detail'][0]['type']
+    error_type = response.json()['detail'][0]['type']
     assert error_type == 'value_error'
 
-    # ...and no DB write should have happened
-    cur: cursor = postgresql.cursor()
-    cur.execute(
-        f'SELECT * FROM topio_user '
-        f'WHERE id=%s AND name=%s AND user_namespace=%s;',
-        (user_id, user_name, user_namespace))
-    results = cur.fetchall()
-    cur.close()
-    assert len(results) == 0
+    # only the normal user's data can be found in the database, i.e. neither
+    # the existing nor the broken user caused a DB write
+    results = await _fetchall(
+        db_session,
+        'SELECT id, name, user_namespace FROM topio_user;')
+    assert results == [(user_id, 'User ABC', 'abc')]
 
+    # numeric name and namespace are stored as strings ---
+    response = await client.post(
+        '/users/register',
+        json={'name': 123, 'user_namespace': 456})
 
-def test_users_register_error_cases(postgresql: connection):
+    assert response.status_code == 201
+    data = response.json()
+    assert data['name'] == '123'
+    assert data['user_namespace'] == '456'
+
+
+async def test_users_register_error_cases(client: AsyncClient):
     """
     We found out that certain error cases are not logged by FastAPI which is why
     we are raising HTTPExpceptions manually whenever things went wrong to get
     hold of the underlying exception and log it.
     """
-    client = _init_test_client(postgresql)
-
     # register two users with same namespace should result in a 500 HTTP status
     # code with a non-empty HTTP payload
     user_1_name = 'User 1'
     user_2_name = 'User 2'
     user_namespace = 'abc'
 
-    response = client.post(
+    response = await client.post(
         '/users/register',
         json={'name': user_1_name, 'user_namespace': user_namespace})
 
     # In the first round everything goes well
-    assert response.status_code == status.HTTP_201_CREATED
+    assert response.status_code == HTTP_201_CREATED
     assert len(response.content) > 20
 
     # Trying to register another user with the same namespace should fail and
     # the HTTP response should clearly state what went wrong
-    response = client.post(
+    response = await client.post(
         '/users/register',
         json={'name': user_2_name, 'user_namespace': user_namespace})
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     print(response.content)
     assert len(response.content) > 20
 
 
-def test_users_info(postgresql: connection):
-    client = _init_test_client(postgresql)
-
+async def test_users_info(client: AsyncClient):
     user_name = 'User ABC'
     user_namespace = 'abc'
-    response = client.post(
+    response = await client.post(
         '/users/register',
         json={'name': user_name, 'user_namespace': user_namespace})
-    user_id: int = json.loads(response.content)['id']
+    user_id: int = response.json()['id']
 
-    response = client.get(
-        f'/users/{user_id}',
-        json={'topio_user_id': user_id})
+    response = await client.get(f'/users/{user_id}')
 
     assert response.status_code == 200
 
     # {"name":"User ABC","user_namespace":"abc","id":1}
-    user_info_data = json.loads(response.content)
+    user_info_data = response.json()
 
     assert user_info_data['name'] == user_name
     assert user_info_data['user_namespace'] == user_namespace
     assert user_info_data['id'] == user_id
 
 
-def test_users_info_error_cases(postgresql: connection):
-    client = _init_test_client(postgresql)
+async def test_users_info_get_db(
+        client: AsyncClient,
+        db_sessionmaker: async_sessionmaker,
+        monkeypatch: pytest.MonkeyPatch):
+    """
+    Runs a request with the service's own get_db dependency. Its scoped
+    session is bound to the test's connection instead of the configured
+    database.
+    """
+    Session = async_scoped_session(db_sessionmaker, scopefunc=current_task)
+    monkeypatch.setattr(ompid.db, 'Session', Session)
+    del app.dependency_overrides[ompid.get_db]
+
+    response = await client.post(
+        '/users/register',
+        json={'name': 'User ABC', 'user_namespace': 'abc'})
+    user_id: int = response.json()['id']
+
+    response = await client.get(f'/users/{user_id}')
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()['user_namespace'] == 'abc'
+
+    # the session of each request was removed (and closed) again
+    assert not Session.registry.registry
+
 
+async def test_users_info_error_cases(client: AsyncClient):
     non_existing_user_id = 666
 
-    response = client.get(f'/users/{non_existing_user_id}')
+    response = await client.get(f'/users/{non_existing_user_id}')
 
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.status_code == HTTP_404_NOT_FOUND
     assert len(response.content) > 20
 
-    client = _init_broken_test_client(postgresql)
+    _use_broken_db()
 
-    response = client.get(f'/users/{non_existing_user_id}')
+    response = await client.get(f'/users/{non_existing_user_id}')
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
 
 
-def test_asset_types_register(postgresql: connection):
-    client = _init_test_client(postgresql)
-
+async def test_asset_types_register(
+        client: AsyncClient,
+        db_session: AsyncSession):
     # normal asset type registration
-    asset_type_id = 'file'
-    asset_type_description = 'Data assets provided as downloadable file'
-
-    response = client.post(
-        '/asset_types/register',
-        json={'id': asset_type_id, 'description': asset_type_description}
-    )
+    response = await client.post(
+        '/asset_types/register', json=FILE_ASSET_TYPE)
 
     assert response.status_code == 201
 
-    cur: cursor = postgresql.cursor()
-    cur.execute(
-        f'SELECT * FROM topio_asset_type WHERE id=%s;',
-        (asset_type_id,))
-    results = cur.fetchall()
-    cur.close()
-    assert len(results) == 1
-    assert results[0][1] == asset_type_description
-
     # existing asset type registration
-    response = client.post(
-        '/asset_types/register',
-        json={'id': asset_type_id, 'description': asset_type_description}
-    )
+    response = await client.post(
+        '/asset_types/register', json=FILE_ASSET_TYPE)
 
     assert response.status_code == 200
 
@@ -216,118 +305,87 @@ def test_asset_types_register(postgresql: connection):
     asset_type_description = \
         'This is a broken asset type with spaces in its identifier string'
 
-    response = client.post(
+    response = await client.post(
         '/asset_types/register',
         json={'id': asset_type_id, 'description': asset_type_description}
     )
 
     assert response.status_code == 422
 
-    cur: cursor = postgresql.cursor()
-    cur.execute(
-        f'SELECT * FROM topio_asset_type WHERE id=%s;',
-        (asset_type_id,))
-    results = cur.fetchall()
-    cur.close()
-    assert len(results) == 0
+    # only the normal asset type was written to the database
+    results = await _fetchall(
+        db_session,
+        'SELECT id, description FROM topio_asset_type;')
+    assert results == [
+        (FILE_ASSET_TYPE['id'], FILE_ASSET_TYPE['description'])]
 
 
-def test_asset_types_register_error_cases(postgresql: connection):
-    client = _init_broken_test_client(postgresql)
+async def test_asset_types_register_error_cases(client: AsyncClient):
+    _use_broken_db()
 
     asset_type_id = 'some_asset_type'
     asset_type_description = \
         'Dummy asset type that should not be created as the client ' \
         'connection is broken'
 
-    response = client.post(
+    response = await client.post(
         '/asset_types/register',
         json={'id': asset_type_id, 'description': asset_type_description})
 
     print(response.status_code)
     print(response.content)
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
 
 
-def test_asset_types_info(postgresql: connection):
-    client = _init_test_client(postgresql)
-
-    asset_type_id = 'file'
-    asset_type_description = 'Data assets provided as downloadable file'
-
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_id, 'description': asset_type_description}
-    )
+async def test_asset_types_info(client: AsyncClient):
+    await client.post('/asset_types/register', json=FILE_ASSET_TYPE)
 
-    response = client.get(
-        f'/asset_types/{asset_type_id}',
-        json={'id': asset_type_id}
-    )
+    response = await client.get(f'/asset_types/{FILE_ASSET_TYPE["id"]}')
 
     assert response.status_code == 200
 
-    asset_info_data = json.loads(response.content)
+    asset_info_data = response.json()
 
-    assert asset_info_data['id'] == asset_type_id
-    assert asset_info_data['description'] == asset_type_description
+    assert asset_info_data['id'] == FILE_ASSET_TYPE['id']
+    assert asset_info_data['description'] == FILE_ASSET_TYPE['description']
 
 
-def test_asset_types_info_error_cases(postgresql: connection):
-    client = _init_test_client(postgresql)
-
+async def test_asset_types_info_error_cases(client: AsyncClient):
     non_existing_asset_type_id = 666
 
-    response = client.get(f'/asset_types/{non_existing_asset_type_id}')
+    response = await client.get(f'/asset_types/{non_existing_asset_type_id}')
 
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.status_code == HTTP_404_NOT_FOUND
     assert len(response.content) > 20
 
-    client = _init_broken_test_client(postgresql)
+    _use_broken_db()
 
-    response = client.get(f'/asset_types/{non_existing_asset_type_id}')
+    response = await client.get(f'/asset_types/{non_existing_asset_type_id}')
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
 
 
-def test_asset_types_list(postgresql: connection):
-    client = _init_test_client(postgresql)
-
-    asset_type_1_id = 'file'
-    asset_type_1_description = 'Data assets provided as downloadable file'
-
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_1_id, 'description': asset_type_1_description}
-    )
-
-    asset_type_2_id = 'api'
-    asset_type_2_description = \
-        'Data that is provided via a well defined application programming ' \
-        'interface'
-
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_2_id, 'description': asset_type_2_description}
-    )
+async def test_asset_types_list(client: AsyncClient):
+    await client.post('/asset_types/register', json=FILE_ASSET_TYPE)
+    await client.post('/asset_types/register', json=API_ASSET_TYPE)
 
     asset_type_3_id = 'stream'
     asset_type_3_description = \
         'Data that is constantly updated and thus provided as a series of ' \
         'data values'
 
-    client.post(
+    await client.post(
         '/asset_types/register',
         json={'id': asset_type_3_id, 'description': asset_type_3_description}
     )
 
-    response = client.get('/asset_types/')
+    response = await client.get('/asset_types/')
 
     assert response.status_code == 200
 
-    assets_list = json.loads(response.content)
+    assets_list = response.json()
 
     assert len(assets_list) == 3
 
@@ -344,53 +402,66 @@ def test_asset_types_list(postgresql: connection):
     #       'description': 'Data that is constantly updated and thus ...'
     #  }
     # ]
-    assert assets_list[0]['id'] == asset_type_1_id
-    assert assets_list[0]['description'] == asset_type_1_description
+    assert assets_list[0]['id'] == FILE_ASSET_TYPE['id']
+    assert assets_list[0]['description'] == FILE_ASSET_TYPE['description']
 
-    assert assets_list[1]['id'] == asset_type_2_id
-    assert assets_list[1]['description'] == asset_type_2_description
+    assert assets_list[1]['id'] == API_ASSET_TYPE['id']
+    assert assets_list[1]['description'] == API_ASSET_TYPE['description']
 
     assert assets_list[2]['id'] == asset_type_3_id
     assert assets_list[2]['description'] == asset_type_3_description
 
 
-def test_asset_types_list_error_cases(postgresql: connection):
-    client = _init_broken_test_client(postgresql)
+async def test_asset_types_list_cache_invalidation(
+        client: AsyncClient, db_session: AsyncSession):
+    await client.post('/asset_types/register', json=FILE_ASSET_TYPE)
 
-    response = client.get('/asset_types/')
+    # fills the cache
+    response = await client.get('/asset_types/')
+    assert len(response.json()) == 1
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-    assert len(response.content) > 20
+    # written past the service, so the cached asset types are still returned
+    db_session.add(TopioAssetTypeORM(**API_ASSET_TYPE))
+    await db_session.commit()
 
+    response = await client.get('/asset_types/')
+    assert len(response.json()) == 1
 
-def test_assets_register(postgresql: connection):
-    client = _init_test_client(postgresql)
+    # registering a new asset type should invalidate the cached asset types
+    await client.post(
+        '/asset_types/register',
+        json={'id': 'stream', 'description': 'Continuous data stream'})
 
-    # register asset owner
-    owner_name = 'User ABC'
-    owner_namespace = 'abc'
-    response = client.post(
-        '/users/register',
-        json={'name': owner_name, 'user_namespace': owner_namespace})
-    owner_id = json.loads(response.content)['id']
+    response = await client.get('/asset_types/')
 
-    # register asset type
-    asset_type_id = 'file'
-    asset_type_description = 'Data assets provided as downloadable file'
+    assert response.status_code == 200
+    assert {asset_type['id'] for asset_type in response.json()} == {
+        FILE_ASSET_TYPE['id'], API_ASSET_TYPE['id'], 'stream'}
 
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_id, 'description': asset_type_description})
 
+async def test_asset_types_list_error_cases(client: AsyncClient):
+    _use_broken_db()
+
+    response = await client.get('/asset_types/')
+
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+    assert len(response.content) > 20
+
+
+async def test_assets_register(
+        client: AsyncClient,
+        owner_id: int,
+        file_asset_type: str,
+        db_session: AsyncSession):
     asset_1_local_id = 'hdfs://foo.bar.ttl'
     asset_1_description = 'A Turtle HDFS file'
 
-    response = client.post(
+    response = await client.post(
         '/assets/register',
         json={
             'local_id': asset_1_local_id,
             'owner_id': owner_id,
-            'asset_type': asset_type_id,
+            'asset_type': file_asset_type,
             'description': asset_1_description})
 
     assert response.status_code == 200
@@ -402,35 +473,20 @@ def test_assets_register(postgresql: connection):
     #   "description":"A Turtle HDFS file",
     #   "topio_id":"topio.abc.1.file"
     # }
-    asset_1_topio_id = json.loads(response.content)['topio_id']
-    asset_1_id = json.loads(response.content)['id']
+    data = response.json()
+    asset_1_topio_id = data['topio_id']
+    asset_1_id = data['id']
 
     assert asset_1_topio_id == \
         TOPIO_ID_SCHEMA.format(**{
-            'owner_namespace': owner_namespace,
+            'owner_namespace': OWNER_NAMESPACE,
             'asset_id': asset_1_id,
-            'asset_type': asset_type_id})
-
-    cur: cursor = postgresql.cursor()
-    cur.execute(
-        f'SELECT * FROM topio_asset WHERE id=%s;',
-        (asset_1_id,))
-    results = cur.fetchall()
-    cur.close()
-
-    assert len(results) == 1
-
-    # [(1, 'hdfs://foo.bar.ttl', 1, 'file', 'A Turtle HDFS file')]
-    assert results[0][0] == asset_1_id
-    assert results[0][1] == asset_1_local_id
-    assert results[0][2] == owner_id
-    assert results[0][3] == asset_type_id
-    assert results[0][4] == asset_1_description
+            'asset_type': file_asset_type})
 
     # asset without local ID and description
-    response = client.post(
+    response = await client.post(
         '/assets/register',
-        json={'owner_id': owner_id, 'asset_type': asset_type_id})
+        json={'owner_id': owner_id, 'asset_type': file_asset_type})
 
     assert response.status_code == 200
 
@@ -442,42 +498,40 @@ def test_assets_register(postgresql: connection):
     #   "id":2,
     #   "topio_id":"topio.abc.2.file"
     # }
-    asset_2_topio_id = json.loads(response.content)['topio_id']
-    asset_2_id = json.loads(response.content)['id']
+    data = response.json()
+    asset_2_topio_id = data['topio_id']
+    asset_2_id = data['id']
 
     assert asset_2_topio_id == \
         TOPIO_ID_SCHEMA.format(**{
-            'owner_namespace': owner_namespace,
+            'owner_namespace': OWNER_NAMESPACE,
             'asset_id': asset_2_id,
-            'asset_type': asset_type_id})
-
-    cur: cursor = postgresql.cursor()
-    cur.execute(
-        f'SELECT * FROM topio_asset WHERE id=%s;',
-        (asset_2_id,))
-    results = cur.fetchall()
-    cur.close()
+            'asset_type': file_asset_type})
 
-    assert len(results) == 1
+    # both assets were written to the database
+    results = await _fetchall(
+        db_session,
+        'SELECT id, local_id, owner_id, asset_type, description '
+        'FROM topio_asset WHERE id = ANY(:ids) ORDER BY id;',
+        ids=[asset_1_id, asset_2_id])
 
-    # [(2, None, 1, 'file', None)]
-    assert results[0][0] == asset_2_id
-    assert results[0][1] is None
-    assert results[0][2] == owner_id
-    assert results[0][3] == asset_type_id
-    assert results[0][4] is None
+    # [(1, 'hdfs://foo.bar.ttl', 1, 'file', 'A Turtle HDFS file'),
+    #  (2, None, 1, 'file', None)]
+    assert results == [
+        (asset_1_id, asset_1_local_id, owner_id, file_asset_type,
+         asset_1_description),
+        (asset_2_id, None, owner_id, file_asset_type, None)]
 
 
-def test_assets_register_error_cases(postgresql: connection):
+async def test_assets_register_error_cases(client: AsyncClient):
     # A request with wrong foreign key IDs should result in a 400 BAD REQUEST
     # status code
-    client = _init_test_client(postgresql)
     asset_1_local_id = 'hdfs://foo.bar.ttl'
     asset_1_description = 'A Turtle HDFS file'
     non_existent_owner_id = 666
     non_existent_asset_type_id = 777
 
-    response = client.post(
+    response = await client.post(
         '/assets/register',
         json={
             'local_id': asset_1_local_id,
@@ -485,15 +539,15 @@ def test_assets_register_error_cases(postgresql: connection):
             'asset_type': non_existent_asset_type_id,
             'description': asset_1_description})
 
-    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.status_code == HTTP_400_BAD_REQUEST
     assert len(response.content) > 20
 
     # Any other error is considered as server side error and should result in
     # a 500 INTERNAL SERVER ERROR return code
 
-    client = _init_broken_test_client(postgresql)
+    _use_broken_db()
 
-    response = client.post(
+    response = await client.post(
         '/assets/register',
         json={
             'local_id': asset_1_local_id,
@@ -501,284 +555,291 @@ def test_assets_register_error_cases(postgresql: connection):
             'asset_type': non_existent_asset_type_id,
             'description': asset_1_description})
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
 
 
-def test_assets_topio_id(postgresql: connection):
-    client = _init_test_client(postgresql)
-
-    # register asset owner
-    owner_name = 'User ABC'
-    owner_namespace = 'abc'
-    response = client.post(
-        '/users/register',
-        json={'name': owner_name, 'user_namespace': owner_namespace})
-    owner_id = json.loads(response.content)['id']
+# assets without local ID are never returned by the local-ID-to-topio-ID lookup
+@pytest.mark.parametrize('asset_index', [1, 2])
+async def test_assets_topio_id(
+        client: AsyncClient, assets: list, asset_index: int):
+    asset = assets[asset_index]
 
-    # register asset type
-    asset_type_id = 'file'
-    asset_type_description = 'Data assets provided as downloadable file'
+    # Calling /assets/topio_id providing a local ID should return the correct
+    # result
+    response = await client.get(
+        '/assets/topio_id',
+        params={
+            'owner_id': asset['owner_id'],
+            'asset_type': asset['asset_type'],
+            'local_id': asset['local_id']})
 
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_id, 'description': asset_type_description})
+    assert response.status_code == 200
 
-    # This asset should be ignored by the get_topio_id method as it does not
-    # have a local ID. So local-ID-to-topio-ID doesn't make sense here.
-    client.post(
-        '/assets/register',
-        json={'owner_id': owner_id, 'asset_type': asset_type_id})
+    returned_topio_id = response.json()
 
-    # Asset with proper local ID which should be considered by the get_topio_id
-    # method
-    asset_2_local_id = 'hdfs://foo.bar.ttl'
-    asset_2_description = 'A Turtle HDFS file'
-    response = client.post(
-        '/assets/register',
-        json={
-            'owner_id': owner_id,
-            'asset_type': asset_type_id,
-            'local_id': asset_2_local_id,
-            'description': asset_2_description})
+    assert returned_topio_id == asset['topio_id']
 
-    asset_2_id = json.loads(response.content)['id']
-    del response
 
-    # Calling /assets/topio_id with an undefined parameter
-    response = client.get(
+async def test_assets_topio_id_same_local_id(client: AsyncClient):
+    """
+    The same local ID may be registered by different owners and for different
+    asset types. Owner ID, asset type and local ID must all be considered when
+    looking up the topio ID.
+    """
+    owner_ids = []
+    for owner_name, owner_namespace in [('User ABC', 'abc'), ('User DEF', 'def')]:
+        response = await client.post(
+            '/users/register',
+            json={'name': owner_name, 'user_namespace': owner_namespace})
+        owner_ids.append(response.json()['id'])
+
+    asset_type_ids = ['file', 'api']
+    for asset_type_id in asset_type_ids:
+        await client.post('/asset_types/register', json={'id': asset_type_id})
+
+    local_id = 'hdfs://foo.bar.ttl'
+    topio_ids = {}
+    for owner_id in owner_ids:
+        for asset_type_id in asset_type_ids:
+            response = await client.post(
+                '/assets/register',
+                json={
+                    'owner_id': owner_id,
+                    'asset_type': asset_type_id,
+                    'local_id': local_id})
+            topio_ids[(owner_id, asset_type_id)] = \
+                response.json()['topio_id']
+
+    assert len(set(topio_ids.values())) == 4
+
+    for (owner_id, asset_type_id), topio_id in topio_ids.items():
+        response = await client.get(
+            '/assets/topio_id',
+            params={
+                'owner_id': owner_id,
+                'asset_type': asset_type_id,
+                'local_id': local_id})
+
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == topio_id
+
+
+async def test_assets_topio_id_error_cases(
+        client: AsyncClient, assets: list):
+    asset = assets[1]
+
+    # Calling /assets/topio_id with an undefined parameter (httpx would send
+    # None as empty string, so local_id is left out entirely)
+    response = await client.get(
         '/assets/topio_id',
         params={
-            'owner_id': owner_id,
-            'asset_type': asset_type_id,
-            'local_id': None})
+            'owner_id': asset['owner_id'],
+            'asset_type': asset['asset_type']})
 
     # should cause a client error 422 (Unprocessable Entity)...
     assert response.status_code == 422
 
-    # Calling /assets/topio_id providing a local ID should return the correct
-    # result
-    response = client.get(
-        '/assets/topio_id',
-        params={
-            'owner_id': owner_id,
-            'asset_type': asset_type_id,
-            'local_id': asset_2_local_id})
-
-    assert response.status_code == 200
-
-    returned_topio_id = json.loads(response.content)
-
-    assert returned_topio_id == TOPIO_ID_SCHEMA.format(**{
-        'owner_namespace': owner_namespace,
-        'asset_id': asset_2_id,
-        'asset_type': asset_type_id})
-
     # Calling /assets/topio_id for non-existent asset registration should
     # return an error with 404 status code
-    response = client.get(
+    response = await client.get(
         '/assets/topio_id',
         params={
             'owner_id': 0,
-            'asset_type': asset_type_id,
-            'local_id': asset_2_local_id})
+            'asset_type': asset['asset_type'],
+            'local_id': asset['local_id']})
 
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.status_code == HTTP_404_NOT_FOUND
     assert len(response.content) > 20
 
-
-def test_assets_topio_id_error_cases(postgresql: connection):
-    client = _init_test_client(postgresql)
-
     non_existent_owner_id = 666
     non_existent_asset_type_id = 777
     non_existent_local_id = 'hdfs:///non/existent'
 
-    response = client.get(
+    response = await client.get(
         '/assets/topio_id',
         params={
             'owner_id': non_existent_owner_id,
             'asset_type': non_existent_asset_type_id,
             'local_id': non_existent_local_id})
 
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.status_code == HTTP_404_NOT_FOUND
     assert len(response.content) > 20
 
-    client = _init_broken_test_client(postgresql)
+    _use_broken_db()
 
-    response = client.get(
+    response = await client.get(
         '/assets/topio_id',
         params={
             'owner_id': non_existent_owner_id,
             'asset_type': non_existent_asset_type_id,
             'local_id': non_existent_local_id})
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
 
 
-def test_assets_custom_id(postgresql: connection):
-    client = _init_test_client(postgresql)
-
-    # register asset owner
-    owner_name = 'User ABC'
-    owner_namespace = 'abc'
-    response = client.post(
-        '/users/register',
-        json={'name': owner_name, 'user_namespace': owner_namespace})
-    owner_id = json.loads(response.content)['id']
-
-    # register asset type
-    asset_type_id = 'file'
-    asset_type_description = 'Data assets provided as downloadable file'
-
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_id, 'description': asset_type_description})
-
-    # Asset without a local ID
-    response = client.post(
+async def test_assets_topio_ids_batch(
+        client: AsyncClient,
+        owner_id: int,
+        file_asset_type: str):
+    asset_1_local_id = 'hdfs://foo.bar.ttl'
+    response = await client.post(
         '/assets/register',
-        json={'owner_id': owner_id, 'asset_type': asset_type_id})
-
-    asset_1_id = json.loads(response.content)['id']
-    asset_1_topio_id = TOPIO_ID_SCHEMA.format(**{
-        'owner_namespace': owner_namespace,
-        'asset_id': asset_1_id,
-        'asset_type': asset_type_id})
-
-    del response
+        json={
+            'owner_id': owner_id,
+            'asset_type': file_asset_type,
+            'local_id': asset_1_local_id})
+    asset_1_topio_id = response.json()['topio_id']
 
-    # Asset with proper local ID
-    asset_2_local_id = 'hdfs://foo.bar.ttl'
-    asset_2_description = 'A Turtle HDFS file'
-    response = client.post(
+    asset_2_local_id = 'hdfs://foo.baz.ttl'
+    response = await client.post(
         '/assets/register',
         json={
             'owner_id': owner_id,
-            'asset_type': asset_type_id,
-            'local_id': asset_2_local_id,
-            'description': asset_2_description})
+            'asset_type': file_asset_type,
+            'local_id': asset_2_local_id})
+    asset_2_topio_id = response.json()['topio_id']
+
+    # results are returned in request order with null for unknown assets
+    response = await client.post(
+        '/assets/topio_ids/batch',
+        json={'items': [
+            {
+                'owner_id': owner_id,
+                'asset_type': file_asset_type,
+                'local_id': asset_2_local_id},
+            {
+                'owner_id': owner_id,
+                'asset_type': file_asset_type,
+                'local_id': 'hdfs:///non/existent'},
+            {
+                'owner_id': owner_id,
+                'asset_type': file_asset_type,
+                'local_id': asset_1_local_id}]})
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == \
+        [asset_2_topio_id, None, asset_1_topio_id]
+
+    response = await client.post('/assets/topio_ids/batch', json={'items': []})
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == []
+
+
+async def test_assets_topio_id_duplicate_local_id(
+        client: AsyncClient,
+        owner_id: int,
+        file_asset_type: str):
+    """
+    A local ID may be registered more than once for the same owner and asset
+    type. The single and the batch lookup must then both return the topio ID
+    of the first registration.
+    """
+    asset = {
+        'owner_id': owner_id,
+        'asset_type': file_asset_type,
+        'local_id': 'hdfs://foo.bar.ttl'}
 
-    asset_2_id = json.loads(response.content)['id']
+    topio_ids = []
+    for _ in range(2):
+        response = await client.post('/assets/register', json=asset)
+        topio_ids.append(response.json()['topio_id'])
 
-    asset_2_topio_id = TOPIO_ID_SCHEMA.format(**{
-        'owner_namespace': owner_namespace,
-        'asset_id': asset_2_id,
-        'asset_type': asset_type_id})
+    assert topio_ids[0] != topio_ids[1]
 
-    del response
+    response = await client.get('/assets/topio_id', params=asset)
 
-    response = client.get(
-        '/assets/custom_id',
-        json={'topio_id': asset_1_topio_id})
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == topio_ids[0]
 
-    # as there is no local ID for asset 1
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await client.post(
+        '/assets/topio_ids/batch', json={'items': [asset]})
 
-    del response
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == [topio_ids[0]]
 
-    response = client.get(
-        '/assets/custom_id',
-        json={'topio_id': asset_2_topio_id})
 
-    assert response.status_code == status.HTTP_200_OK
+async def test_assets_topio_ids_batch_error_cases(client: AsyncClient):
+    # too many items for a single lookup query are rejected
+    response = await client.post(
+        '/assets/topio_ids/batch',
+        json={'items': [{
+            'owner_id': 666,
+            'asset_type': 'file',
+            'local_id': f'hdfs:///non/existent/{i}'}
+            for i in range(MAX_BATCH_SIZE + 1)]})
 
-    returned_local_id = json.loads(response.content)
-    assert returned_local_id == asset_2_local_id
+    assert response.status_code == 422
 
+    # as with a single lookup the local ID is required
+    response = await client.post(
+        '/assets/topio_ids/batch',
+        json={'items': [{'owner_id': 666, 'asset_type': 'file'}]})
 
-def test_assets_custom_id_error_cases(postgresql: connection):
-    client = _init_test_client(postgresql)
+    assert response.status_code == 422
 
-    non_existent_topio_id = 'a.b.c'
+    _use_broken_db()
 
-    response = client.get(
-        '/assets/custom_id',
-        json={'topio_id': non_existent_topio_id})
+    response = await client.post(
+        '/assets/topio_ids/batch',
+        json={'items': [{
+            'owner_id': 666,
+            'asset_type': 'file',
+            'local_id': 'hdfs:///non/existent'}]})
 
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
 
-    client = _init_broken_test_client(postgresql)
-    response = client.get(
-        '/assets/custom_id',
-        json={'topio_id': non_existent_topio_id})
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-    assert len(response.content) > 20
+@pytest.mark.parametrize('asset_index', [0, 1, 2])
+async def test_assets_custom_id(
+        client: AsyncClient, assets: list, asset_index: int):
+    asset = assets[asset_index]
 
+    response = await client.get(
+        '/assets/custom_id',
+        params={'topio_id': asset['topio_id']})
 
-def test_assets_list(postgresql: connection):
-    client = _init_test_client(postgresql)
+    if asset['local_id'] is None:
+        # as there is no local ID for the asset
+        assert response.status_code == HTTP_404_NOT_FOUND
+    else:
+        assert response.status_code == HTTP_200_OK
 
-    # register asset owner
-    owner_name = 'User ABC'
-    owner_namespace = 'abc'
-    response = client.post(
-        '/users/register',
-        json={'name': owner_name, 'user_namespace': owner_namespace})
-    owner_id = json.loads(response.content)['id']
+        returned_local_id = response.json()
+        assert returned_local_id == asset['local_id']
 
-    # register asset types
-    asset_type_1_id = 'file'
-    asset_type_1_description = 'Data assets provided as downloadable file'
 
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_1_id, 'description': asset_type_1_description})
+async def test_assets_custom_id_error_cases(client: AsyncClient):
+    non_existent_topio_id = 'a.b.c'
 
-    asset_type_2_id = 'api'
-    asset_type_2_description = \
-        'Data that is provided via a well defined application programming ' \
-        'interface'
+    response = await client.get(
+        '/assets/custom_id',
+        params={'topio_id': non_existent_topio_id})
 
-    client.post(
-        '/asset_types/register',
-        json={'id': asset_type_2_id, 'description': asset_type_2_description})
+    assert response.status_code == HTTP_404_NOT_FOUND
+    assert len(response.content) > 20
 
-    # register assets
-    response = client.post(
-        '/assets/register',
-        json={'owner_id': owner_id, 'asset_type': asset_type_1_id})
+    # the topio ID is a mandatory query parameter
+    response = await client.get('/assets/custom_id')
 
-    asset_1_id = json.loads(response.content)['id']
-    asset_1_topio_id = TOPIO_ID_SCHEMA.format(**{
-        'owner_namespace': owner_namespace,
-        'asset_id': asset_1_id,
-        'asset_type': asset_type_1_id})
+    assert response.status_code == 422
 
-    asset_2_local_id = 'hdfs://foo.bar.ttl'
-    asset_2_description = 'A Turtle HDFS file'
-    response = client.post(
-        '/assets/register',
-        json={
-            'owner_id': owner_id,
-            'asset_type': asset_type_1_id,
-            'local_id': asset_2_local_id,
-            'description': asset_2_description})
-
-    asset_2_id = json.loads(response.content)['id']
-    asset_2_topio_id = TOPIO_ID_SCHEMA.format(**{
-        'owner_namespace': owner_namespace,
-        'asset_id': asset_2_id,
-        'asset_type': asset_type_1_id})
-
-    asset_3_local_id = 'http://topio.market:7777/api'
-    response = client.post(
-        '/assets/register',
-        json={
-            'owner_id': owner_id,
-            'asset_type': asset_type_2_id,
-            'local_id': asset_3_local_id})
+    _use_broken_db()
+    response = await client.get(
+        '/assets/custom_id',
+        params={'topio_id': non_existent_topio_id})
 
-    asset_3_id = json.loads(response.content)['id']
-    asset_3_topio_id = TOPIO_ID_SCHEMA.format(**{
-        'owner_namespace': owner_namespace,
-        'asset_id': asset_3_id,
-        'asset_type': asset_type_2_id})
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+    assert len(response.content) > 20
 
-    response = client.get(
+
+async def test_assets_list(client: AsyncClient, owner_id: int, assets: list):
+    # httpx' get() does not support request bodies
+    response = await client.request(
+        'GET',
         '/assets/',
         json={'user_id': owner_id})
 
@@ -810,50 +871,26 @@ def test_assets_list(postgresql: connection):
     #     "topio_id":"topio.abc.3.api"
     #   }
     # ]
-    results = json.loads(response.content)
-
-    # asset 1 info
-    tmp_res = list(filter(lambda d: d['id'] == asset_1_id, results))
-    assert len(tmp_res) == 1
-    tmp_res = tmp_res[0]
-    assert tmp_res['local_id'] is None
-    assert tmp_res['owner_id'] == owner_id
-    assert tmp_res['asset_type'] == asset_type_1_id
-    assert tmp_res['description'] is None
-    assert tmp_res['topio_id'] == asset_1_topio_id
-
-    # asset 2 info
-    tmp_res = list(filter(lambda d: d['id'] == asset_2_id, results))
-    assert len(tmp_res) == 1
-    tmp_res = tmp_res[0]
-    assert tmp_res['local_id'] == asset_2_local_id
-    assert tmp_res['owner_id'] == owner_id
-    assert tmp_res['asset_type'] == asset_type_1_id
-    assert tmp_res['description'] == asset_2_description
-    assert tmp_res['topio_id'] == asset_2_topio_id
-
-    # asset 3 info
-    tmp_res = list(filter(lambda d: d['id'] == asset_3_id, results))
-    assert len(tmp_res) == 1
-    tmp_res = tmp_res[0]
-    assert tmp_res['local_id'] == asset_3_local_id
-    assert tmp_res['owner_id'] == owner_id
-    assert tmp_res['asset_type'] == asset_type_2_id
-    assert tmp_res['description'] is None
-    assert tmp_res['topio_id'] == asset_3_topio_id
-
-
-def test_assets_list_error_cases(postgresql: connection):
-    client = _init_broken_test_client(postgresql)
+    results = response.json()
+    by_id = {result['id']: result for result in results}
+    assert len(results) == len(by_id) == 3
+
+    for asset in assets:
+        assert by_id[asset['id']] == asset
+
+
+async def test_assets_list_error_cases(client: AsyncClient):
+    _use_broken_db()
 
     non_existent_owner_id = 666
 
-    response = client.get(
+    response = await client.request(
+        'GET',
         '/assets/',
         json={'user_id': non_existent_owner_id})
 
     print(response.status_code)
     print(response.content)
 
-    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
     assert len(response.content) > 20
@@ -0,0 +1,165 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from pytest_postgresql import factories
+from pytest_postgresql.executor import PostgreSQLExecutor
+from pytest_postgresql.janitor import DatabaseJanitor
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker,
+    create_async_engine)
+from sqlalchemy.pool import NullPool
+
+import ompid
+from ompid import app, Base
+
+
+def _create_tables(
+        host: str, port: int, user: str, dbname: str, password: str):
+    db_url = URL.create(
+        'postgresql+psycopg',
+        username=user,
+        password=password,
+        host=host,
+        port=port,
+        database=dbname)
+
+    schema_engine = create_engine(db_url)
+    Base.metadata.create_all(schema_engine)
+
+    # Test data doesn't need to survive a crash, so skip the WAL. Referencing
+    # tables go first as permanent tables may not reference unlogged ones.
+    with schema_engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(text(f'ALTER TABLE {table.name} SET UNLOGGED'))
+
+    schema_engine.dispose()
+
+
+# Each pytest-xdist worker starts its own PostgreSQL process; the worker ID in
+# the database name additionally keeps the workers apart on a shared server
+_xdist_worker = os.getenv('PYTEST_XDIST_WORKER')
+
+# The tables are created once in the template database of the PostgreSQL
+# process; test databases are cloned from it. The server's data is thrown away
+# after the test session, so it doesn't need to be flushed to disk.
+postgresql_proc = factories.postgresql_proc(
+    dbname=f'tests_{_xdist_worker}' if _xdist_worker else None,
+    load=[_create_tables],
+    postgres_options=(
+        '-c fsync=off -c synchronous_commit=off -c full_page_writes=off'))
+
+
+@pytest.fixture(scope='session')
+def db_url(postgresql_proc: PostgreSQLExecutor) -> URL:
+    # Created from the template database which already contains the tables
+    with DatabaseJanitor(
+            postgresql_proc.user,
+            postgresql_proc.host,
+            postgresql_proc.port,
+            postgresql_proc.dbname,
+            postgresql_proc.version,
+            postgresql_proc.password):
+        db_url = URL.create(
+            'postgresql+psycopg',
+            username=postgresql_proc.user,
+            password=postgresql_proc.password,
+            host=postgresql_proc.host,
+            port=postgresql_proc.port,
+            database=postgresql_proc.dbname)
+
+        yield db_url
+
+
+@pytest.fixture(scope='session')
+def engine(db_url: URL) -> AsyncEngine:
+    # Without pooled connections the engine is not bound to the event loop of a
+    # single test
+    return create_async_engine(
+        db_url.set(drivername='postgresql+asyncpg'), poolclass=NullPool)
+
+
+@pytest_asyncio.fixture
+async def db_connection(engine: AsyncEngine) -> AsyncConnection:
+    """
+    Connection of a single test. Everything written during the test happens
+    inside one outer transaction which is rolled back afterwards instead of
+    recreating the tables.
+    """
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+
+        yield connection
+
+        await transaction.rollback()
+
+
+@pytest.fixture
+def db_sessionmaker(db_connection: AsyncConnection) -> async_sessionmaker:
+    # Commits of the service only release a savepoint of the outer transaction
+    return async_sessionmaker(
+        db_connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode='create_savepoint')
+
+
+@pytest_asyncio.fixture
+async def db_session(db_sessionmaker: async_sessionmaker) -> AsyncSession:
+    async with db_sessionmaker() as db:
+        yield db
+
+
+@pytest.fixture(scope='session')
+def test_client() -> httpx.AsyncClient:
+    # Requests are passed to the app directly on the event loop of the test
+    test_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+    yield test_client
+
+    # the client isn't bound to an event loop, so it's closed on a new one
+    asyncio.run(test_client.aclose())
+
+
+@pytest.fixture(autouse=True)
+def _reset_overrides():
+    dependency_overrides = dict(app.dependency_overrides)
+
+    yield
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(dependency_overrides)
+
+
+@pytest_asyncio.fixture
+async def client(
+        test_client: httpx.AsyncClient,
+        db_sessionmaker: async_sessionmaker) -> httpx.AsyncClient:
+    """
+    The session's test client with requests run against the connection of the
+    current test and an empty cache
+    """
+    async def get_mock_db():
+        async with db_sessionmaker() as db:
+            yield db
+
+    app.dependency_overrides[ompid.get_db] = get_mock_db
+
+    FastAPICache.reset()
+    FastAPICache.init(
+        InMemoryBackend(),
+        prefix=ompid.CACHE_PREFIX,
+        # long enough that cached responses don't expire during a test
+        expire=60,
+        key_builder=ompid.build_cache_key)
+    # the in-memory store is shared between backend instances
+    await FastAPICache.clear()
+
+    return test_client